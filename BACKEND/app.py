@@ -1,11 +1,17 @@
 # app.py
 from fastapi import FastAPI, HTTPException, status, Depends, Query
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
+from starlette.concurrency import run_in_threadpool
 from pydantic import BaseModel, Field, constr
-import sqlite3
+import aiosqlite
+import asyncio
+import bisect
+import contextlib
 import datetime
-import threading
+import heapq
+import glob
 import logging
+from collections import defaultdict
 from typing import Optional, List
 import json
 from jose import JWTError, jwt
@@ -15,10 +21,27 @@ from google import genai as genai2
 import os
 from PIL import Image
 from io import BytesIO
+import maintenance
 
 
 # ---------- CONFIG ----------
 DB_PATH = "main.db"
+# per-resource concurrency limits (replace the implicit threadpool cap)
+GEMINI_MAX_CONCURRENCY = int(os.getenv("GEMINI_MAX_CONCURRENCY", "32"))
+OPENAI_MAX_CONCURRENCY = int(os.getenv("OPENAI_MAX_CONCURRENCY", "8"))
+HASH_MAX_CONCURRENCY = int(os.getenv("HASH_MAX_CONCURRENCY", "4"))
+# likes/views are buffered in memory and written behind in batches
+ENGAGEMENT_JOURNAL = os.getenv("ENGAGEMENT_JOURNAL", "engagement.journal")
+ENGAGEMENT_FLUSH_INTERVAL = float(os.getenv("ENGAGEMENT_FLUSH_INTERVAL", "2"))
+# journal lines are written off the event loop in batches this often
+ENGAGEMENT_JOURNAL_INTERVAL = float(os.getenv("ENGAGEMENT_JOURNAL_INTERVAL", "0.2"))
+VIEW_EVENT_CHUNK = 100
+# seconds between online maintenance runs (see maintenance.py), 0 disables
+MAINTENANCE_INTERVAL = float(os.getenv("MAINTENANCE_INTERVAL", "0"))
+# /users/search: prefixes matching more index entries than the scan limit are
+# served from a precomputed top-K, the rest are scanned
+USER_SEARCH_TOP_K = 50
+USER_SEARCH_SCAN_LIMIT = 200
 logging.basicConfig(filename="logfile.log", level=logging.INFO,
                     format="%(asctime)s : %(levelname)s : %(message)s")
 
@@ -35,16 +58,49 @@ app.add_middleware(
 )
 
 # ---------- DB CONNECTION ----------
-db_lock = threading.Lock()
+db_lock = asyncio.Lock()
 _conn = None
 
-def get_conn():
+async def get_conn():
     global _conn
     if _conn is None:
-        _conn = sqlite3.connect(DB_PATH, check_same_thread=False)
-        _conn.row_factory = sqlite3.Row
+        _conn = await aiosqlite.connect(DB_PATH)
+        _conn.row_factory = aiosqlite.Row
+        # must come before anything that initializes the file (the WAL switch does);
+        # only takes effect on a fresh file, `maintenance.py vacuum --full` converts an existing one
+        await _conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+        # WAL lets maintenance.py back up / check the file while we keep writing
+        await _conn.execute("PRAGMA journal_mode=WAL")
     return _conn
 
+async def close_conn():
+    global _conn
+    if _conn is not None:
+        await _conn.close()
+        _conn = None
+
+# ---------- RESOURCE LIMITS ----------
+gemini_semaphore = asyncio.Semaphore(GEMINI_MAX_CONCURRENCY)
+openai_semaphore = asyncio.Semaphore(OPENAI_MAX_CONCURRENCY)
+hash_semaphore = asyncio.Semaphore(HASH_MAX_CONCURRENCY)
+
+# ---------- LLM CLIENTS ----------
+# one AsyncOpenAI client (and its httpx pool) shared by every request
+_openai_client = None
+
+def get_openai_client():
+    global _openai_client
+    if _openai_client is None:
+        from openai import AsyncOpenAI
+        _openai_client = AsyncOpenAI(api_key="")
+    return _openai_client
+
+async def close_openai_client():
+    global _openai_client
+    if _openai_client is not None:
+        await _openai_client.close()
+        _openai_client = None
+
 def log_exception(e: Exception):
     logging.exception(e)
 
@@ -60,11 +116,14 @@ ACCESS_TOKEN_EXPIRE_MINUTES = 60
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/login")
 
-def hash_password(password: str) -> str:
-    return pwd_context.hash(password)
+# bcrypt is CPU bound, so it runs off the event loop under its own limit
+async def hash_password(password: str) -> str:
+    async with hash_semaphore:
+        return await run_in_threadpool(pwd_context.hash, password)
 
-def verify_password(password: str, hashed: str) -> bool:
-    return pwd_context.verify(password, hashed)
+async def verify_password(password: str, hashed: str) -> bool:
+    async with hash_semaphore:
+        return await run_in_threadpool(pwd_context.verify, password, hashed)
 
 def create_access_token(data: dict, expires_delta: Optional[datetime.timedelta] = None):
     to_encode = data.copy()
@@ -72,11 +131,11 @@ def create_access_token(data: dict, expires_delta: Optional[datetime.timedelta]
     to_encode.update({"exp": expire})
     return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
 
-def get_current_user(token: str = Depends(oauth2_scheme)):
+async def get_current_user(token: str = Depends(oauth2_scheme)):
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         user_id: str = payload.get("sub")
-        if user_id is None or not user_exists(user_id):
+        if user_id is None or not await user_exists(user_id):
             raise HTTPException(status_code=401, detail="Invalid authentication credentials")
         return user_id
     except JWTError:
@@ -117,6 +176,13 @@ class PostOut(BaseModel):
     content: str
     shared: bool
     hashtags: Optional[List[str]] = None
+    likes: int = 0
+    views: int = 0
+
+class UserSearchOut(BaseModel):
+    userId: str
+    name: str
+    followers: int
 
 
 class HashtagReq(BaseModel):
@@ -128,11 +194,10 @@ class HashtagReq(BaseModel):
     content: Optional[str] = None
     language: Optional[str] = Field(None, description="Language code for translation, e.g., 'es' for Spanish")
 # ---------- DB Init ----------
-def system_init():
+async def system_init():
     try:
-        conn = get_conn()
-        cur = conn.cursor()
-        cur.execute('''
+        conn = await get_conn()
+        await conn.execute('''
             CREATE TABLE IF NOT EXISTS USERS (
                 userId TEXT PRIMARY KEY,
                 name TEXT NOT NULL,
@@ -140,7 +205,7 @@ def system_init():
                 dateCreated DATE NOT NULL
             )
         ''')
-        cur.execute('''
+        await conn.execute('''
             CREATE TABLE IF NOT EXISTS POST (
                 postId INTEGER PRIMARY KEY AUTOINCREMENT,
                 userId TEXT NOT NULL REFERENCES USERS(userId),
@@ -152,66 +217,478 @@ def system_init():
                 hashtags TEXT DEFAULT ''
             )
         ''')
-        cur.execute('''
+        await conn.execute('''
             CREATE TABLE IF NOT EXISTS FOLLOWERS (
                 followeeID TEXT NOT NULL REFERENCES USERS(userId),
                 followerID TEXT NOT NULL REFERENCES USERS(userId),
                 PRIMARY KEY (followeeID, followerID)
             )
         ''')
-        conn.commit()
+        await conn.execute('''
+            CREATE TABLE IF NOT EXISTS LIKES (
+                postId INTEGER NOT NULL REFERENCES POST(postId),
+                userId TEXT NOT NULL REFERENCES USERS(userId),
+                PRIMARY KEY (postId, userId)
+            )
+        ''')
+        await conn.execute('''
+            CREATE TABLE IF NOT EXISTS POST_STATS (
+                postId INTEGER PRIMARY KEY REFERENCES POST(postId),
+                likes INTEGER NOT NULL DEFAULT 0,
+                views INTEGER NOT NULL DEFAULT 0
+            )
+        ''')
+        await conn.execute('''
+            CREATE TABLE IF NOT EXISTS ENGAGEMENT_META (
+                key TEXT PRIMARY KEY,
+                value INTEGER NOT NULL
+            )
+        ''')
+        await conn.commit()
     except Exception as e:
         log_exception(e)
         raise
 
 @app.on_event("startup")
-def startup_event():
-    system_init()
+async def startup_event():
+    global _flush_task, _journal_task, _maintenance_task
+    await system_init()
+    await user_index_init()
+    await engagement_init()
+    _flush_task = asyncio.create_task(engagement_flush_loop())
+    _journal_task = asyncio.create_task(journal_writer_loop())
+    if MAINTENANCE_INTERVAL > 0:
+        _maintenance_task = asyncio.create_task(maintenance_loop())
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    for task in (_flush_task, _journal_task, _maintenance_task):
+        if task is not None:
+            task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await task
+    await flush_engagement()
+    if _journal is not None:
+        await flush_journal()
+        _journal.close()
+    await close_openai_client()
+    await close_conn()
 
 # ---------- Helper ----------
-def user_exists(userID: str) -> bool:
-    conn = get_conn()
-    cur = conn.cursor()
-    cur.execute("SELECT 1 FROM USERS WHERE userId = ?", (userID,))
-    return cur.fetchone() is not None
+async def user_exists(userID: str) -> bool:
+    conn = await get_conn()
+    async with conn.execute("SELECT 1 FROM USERS WHERE userId = ?", (userID,)) as cur:
+        return await cur.fetchone() is not None
+
+async def post_exists(postID: int) -> bool:
+    conn = await get_conn()
+    async with conn.execute("SELECT 1 FROM POST WHERE postId = ?", (postID,)) as cur:
+        return await cur.fetchone() is not None
+
+# ---------- ENGAGEMENT (write-behind) ----------
+# Likes and views are applied to in-memory buffers and every event is queued as
+# a journal line. journal_writer_loop() appends queued lines to the current
+# journal segment in the threadpool every ENGAGEMENT_JOURNAL_INTERVAL seconds,
+# so a crash loses at most that window. flush_engagement() moves a whole batch into SQLite in one transaction and
+# records the last journal seq it covers in ENGAGEMENT_META; on startup the
+# segments are replayed from that seq onwards.
+#
+# db_lock is held while swapping/flushing a batch and while reading stats, so
+# readers always see either "DB + buffered deltas" or the flushed DB, never a
+# half-applied batch.
+_pending_likes = {}              # (userId, postId) -> liked
+_like_deltas = defaultdict(int)  # postId -> buffered like delta
+_view_deltas = defaultdict(int)  # postId -> buffered view delta
+_journal = None
+_journal_index = 0
+_journal_seq = 0
+_journal_lines = []              # journal lines not yet written
+_journal_lock = asyncio.Lock()   # orders batched appends against segment rotation
+_flush_task = None
+_journal_task = None
+
+def _journal_segments():
+    segments = []
+    for path in glob.glob(ENGAGEMENT_JOURNAL + ".*"):
+        suffix = path[len(ENGAGEMENT_JOURNAL) + 1:]
+        if suffix.isdigit():
+            segments.append((int(suffix), path))
+    return sorted(segments)
+
+def _open_journal(index: int):
+    global _journal, _journal_index
+    _journal_index = index
+    _journal = open(f"{ENGAGEMENT_JOURNAL}.{index}", "a")
+
+def _remove_segments(upto: int):
+    for index, path in _journal_segments():
+        if index <= upto:
+            os.remove(path)
+
+def _append_journal(data: str):
+    _journal.write(data)
+    _journal.flush()
+
+def _rotate_journal(data: str) -> int:
+    # writes the batch's remaining lines, then starts a new segment;
+    # returns the index of the segment that was closed
+    closed = _journal_index
+    _journal.write(data)
+    _journal.close()
+    _open_journal(closed + 1)
+    return closed
+
+def _journal_write(*event):
+    global _journal_seq
+    _journal_seq += 1
+    _journal_lines.append(json.dumps([_journal_seq, *event]) + "\n")
+
+async def flush_journal():
+    global _journal_lines
+    async with _journal_lock:
+        if not _journal_lines:
+            return
+        data, _journal_lines = "".join(_journal_lines), []
+        try:
+            await run_in_threadpool(_append_journal, data)
+        except Exception:
+            _journal_lines.insert(0, data)
+            raise
+
+def _restore_batch(likes: dict, like_deltas: dict, view_deltas: dict):
+    for key, liked in likes.items():
+        _pending_likes.setdefault(key, liked)
+    for p, d in like_deltas.items():
+        _like_deltas[p] += d
+    for p, d in view_deltas.items():
+        _view_deltas[p] += d
+
+def _buffer_like(userID: str, postID: int, liked: bool, current: bool) -> bool:
+    # `current` is the effective state from _like_state()
+    if current == liked:
+        return False
+    _pending_likes[(userID, postID)] = liked
+    _like_deltas[postID] += 1 if liked else -1
+    return True
+
+def _buffer_views(post_ids: List[int]):
+    for post_id in post_ids:
+        _view_deltas[post_id] += 1
+
+async def _like_state(conn, userID: str, postID: int) -> bool:
+    key = (userID, postID)
+    if key in _pending_likes:
+        return _pending_likes[key]
+    async with conn.execute("SELECT 1 FROM LIKES WHERE postId = ? AND userId = ?", (postID, userID)) as cur:
+        return await cur.fetchone() is not None
+
+async def engagement_init():
+    global _journal_seq
+    conn = await get_conn()
+    async with conn.execute("SELECT value FROM ENGAGEMENT_META WHERE key = 'last_seq'") as cur:
+        row = await cur.fetchone()
+    last_seq = row["value"] if row else 0
+    _journal_seq = last_seq
+
+    segments = _journal_segments()
+    async with db_lock:
+        for _, path in segments:
+            with open(path) as f:
+                for line in f:
+                    try:
+                        seq, kind, *args = json.loads(line)
+                    except ValueError:
+                        # torn write from a crash mid-append
+                        continue
+                    _journal_seq = max(_journal_seq, seq)
+                    if seq <= last_seq:
+                        continue
+                    if kind == "like":
+                        userID, postID, liked = args
+                        _buffer_like(userID, postID, bool(liked), await _like_state(conn, userID, postID))
+                    elif kind == "view":
+                        _buffer_views(args[0])
+    _open_journal(segments[-1][0] + 1 if segments else 0)
+    await flush_engagement()
+    if not _pending_likes and not _view_deltas:
+        _remove_segments(_journal_index - 1)
+
+async def flush_engagement():
+    # shielded: cancelling a caller (e.g. the flush loop at shutdown) can't
+    # interrupt a batch mid-write, or after its commit is already queued
+    await asyncio.shield(_flush_engagement())
+
+async def _flush_engagement():
+    global _pending_likes, _like_deltas, _view_deltas, _journal_lines
+    async with db_lock:
+        if _journal is None or (not _pending_likes and not _view_deltas):
+            return
+        likes, like_deltas, view_deltas = _pending_likes, _like_deltas, _view_deltas
+        _pending_likes, _like_deltas, _view_deltas = {}, defaultdict(int), defaultdict(int)
+        last_seq = _journal_seq
+        # lines queued up to the swap belong to this batch's segment; anything
+        # queued from here on lands in the next one
+        data, _journal_lines = "".join(_journal_lines), []
+        try:
+            async with _journal_lock:
+                closed = await run_in_threadpool(_rotate_journal, data)
+        except Exception as e:
+            log_exception(e)
+            _journal_lines.insert(0, data)
+            _restore_batch(likes, like_deltas, view_deltas)
+            return
+
+        conn = await get_conn()
+        try:
+            await conn.executemany(
+                "INSERT OR IGNORE INTO LIKES (postId, userId) VALUES (?, ?)",
+                [(p, u) for (u, p), liked in likes.items() if liked]
+            )
+            await conn.executemany(
+                "DELETE FROM LIKES WHERE postId = ? AND userId = ?",
+                [(p, u) for (u, p), liked in likes.items() if not liked]
+            )
+            await conn.executemany(
+                "INSERT INTO POST_STATS (postId, likes, views) VALUES (?, ?, ?) "
+                "ON CONFLICT(postId) DO UPDATE SET likes = likes + excluded.likes, views = views + excluded.views",
+                [(p, like_deltas.get(p, 0), view_deltas.get(p, 0)) for p in set(like_deltas) | set(view_deltas)]
+            )
+            await conn.execute(
+                "INSERT INTO ENGAGEMENT_META (key, value) VALUES ('last_seq', ?) "
+                "ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+                (last_seq,)
+            )
+            await conn.commit()
+        except Exception as e:
+            # nothing was committed: put the batch back; its journal segments
+            # are kept until a flush succeeds
+            log_exception(e)
+            await conn.rollback()
+            _restore_batch(likes, like_deltas, view_deltas)
+            return
+
+    await run_in_threadpool(_remove_segments, closed)
+
+async def engagement_flush_loop():
+    while True:
+        await asyncio.sleep(ENGAGEMENT_FLUSH_INTERVAL)
+        try:
+            await flush_engagement()
+        except Exception as e:
+            log_exception(e)
+
+async def journal_writer_loop():
+    while True:
+        await asyncio.sleep(ENGAGEMENT_JOURNAL_INTERVAL)
+        try:
+            await flush_journal()
+        except Exception as e:
+            log_exception(e)
+
+def record_views(post_ids: List[int]):
+    _buffer_views(post_ids)
+    for i in range(0, len(post_ids), VIEW_EVENT_CHUNK):
+        _journal_write("view", post_ids[i:i + VIEW_EVENT_CHUNK])
+
+async def set_like(userID: str, postID: int, liked: bool) -> bool:
+    conn = await get_conn()
+    async with db_lock:
+        changed = _buffer_like(userID, postID, liked, await _like_state(conn, userID, postID))
+        if changed:
+            _journal_write("like", userID, postID, int(liked))
+    return changed
+
+async def get_post_stats(post_ids: List[int]) -> dict:
+    # {postId: (likes, views)} with buffered deltas merged in
+    conn = await get_conn()
+    stats = {p: (0, 0) for p in post_ids}
+    ids = list(stats)
+    async with db_lock:
+        for i in range(0, len(ids), 500):
+            chunk = ids[i:i + 500]
+            placeholders = ",".join("?" * len(chunk))
+            async with conn.execute(
+                f"SELECT postId, likes, views FROM POST_STATS WHERE postId IN ({placeholders})", chunk
+            ) as cur:
+                for r in await cur.fetchall():
+                    stats[r["postId"]] = (r["likes"], r["views"])
+        for p in ids:
+            likes, views = stats[p]
+            stats[p] = (likes + _like_deltas.get(p, 0), views + _view_deltas.get(p, 0))
+    return stats
+
+# ---------- MAINTENANCE ----------
+_maintenance_task = None
+
+async def maintenance_loop():
+    # maintenance.py uses its own connections, so only a threadpool slot is held
+    while True:
+        await asyncio.sleep(MAINTENANCE_INTERVAL)
+        try:
+            await run_in_threadpool(maintenance.run_all, DB_PATH)
+        except Exception as e:
+            log_exception(e)
+
+# ---------- USER SEARCH INDEX ----------
+# Keys are the lowercased userId, the full display name and each word of it,
+# kept in the sorted _user_keys array. A prefix query bisects out the range of
+# matching keys:
+#   - at most USER_SEARCH_SCAN_LIMIT entries ("light"): scan and rank them;
+#   - more than that ("heavy"): answer from _top_users[prefix], the top-K
+#     userIds by follower count, precomputed for every heavy prefix.
+# Either way a lookup touches a bounded number of entries. Heavy prefixes
+# form a trie-shaped set (every prefix of a heavy prefix is heavy), built at
+# startup and kept current by register / follow_user, so searches never
+# touch SQLite.
+#
+# Entries are never removed and follower counts only ever go up (there is no
+# unfollow), so a prefix never turns light again and a user never has to be
+# back-filled into a top-K list they dropped out of.
+_user_keys = []                       # sorted [(key, userId)]
+_user_names = {}                      # userId -> name
+_follower_counts = defaultdict(int)   # userId -> followers
+_top_users = {}                       # heavy prefix -> userIds ranked by _user_rank
+_MAX_CHAR = "\U0010ffff"
+
+def _user_rank(userID: str):
+    return (-_follower_counts.get(userID, 0), userID)
+
+def _index_keys(userID: str, name: str):
+    words = name.lower().split()
+    return {userID.lower(), " ".join(words), *words} - {""}
+
+def _prefix_range(prefix: str, lo: int = 0, hi: Optional[int] = None):
+    hi = len(_user_keys) if hi is None else hi
+    return (bisect.bisect_left(_user_keys, (prefix,), lo, hi),
+            bisect.bisect_left(_user_keys, (prefix + _MAX_CHAR,), lo, hi))
+
+def _rank_range(lo: int, hi: int, limit: int = USER_SEARCH_TOP_K) -> List[str]:
+    return heapq.nsmallest(limit, {u for _, u in _user_keys[lo:hi]}, key=_user_rank)
+
+def _offer_top(prefix: str, userID: str):
+    top = _top_users[prefix]
+    if userID not in top:
+        top.append(userID)
+    top.sort(key=_user_rank)
+    del top[USER_SEARCH_TOP_K:]
+
+def _build_top_users():
+    # bottom-up: a heavy prefix's top-K is the top-K of its heavy children's
+    # top-Ks plus its light children's entries, so each entry is ranked once
+    top = {}
+    def build(lo, hi, depth):
+        users = set()
+        # keys equal to the prefix itself sort first and have no children
+        i = lo
+        while i < hi and len(_user_keys[i][0]) == depth:
+            users.add(_user_keys[i][1])
+            i += 1
+        while i < hi:
+            _, j = _prefix_range(_user_keys[i][0][:depth + 1], i, hi)
+            if j - i > USER_SEARCH_SCAN_LIMIT:
+                users.update(build(i, j, depth + 1))
+            else:
+                users.update(u for _, u in _user_keys[i:j])
+            i = j
+        ranked = heapq.nsmallest(USER_SEARCH_TOP_K, users, key=_user_rank)
+        if depth:
+            top[_user_keys[lo][0][:depth]] = ranked
+        return ranked
+    if _user_keys:
+        build(0, len(_user_keys), 0)
+    return top
+
+def _update_prefixes(userID: str, keys):
+    for key in keys:
+        for n in range(1, len(key) + 1):
+            prefix = key[:n]
+            if prefix in _top_users:
+                _offer_top(prefix, userID)
+                continue
+            lo, hi = _prefix_range(prefix)
+            if hi - lo <= USER_SEARCH_SCAN_LIMIT:
+                break   # light, and so is every longer prefix
+            # just turned heavy
+            _top_users[prefix] = _rank_range(lo, hi)
+
+def index_user(userID: str, name: str):
+    _user_names[userID] = name
+    keys = _index_keys(userID, name)
+    for key in keys:
+        bisect.insort(_user_keys, (key, userID))
+    _update_prefixes(userID, keys)
+
+def index_follow(followeeID: str):
+    _follower_counts[followeeID] += 1
+    if followeeID in _user_names:
+        _update_prefixes(followeeID, _index_keys(followeeID, _user_names[followeeID]))
+
+async def user_index_init():
+    global _user_keys, _top_users
+    conn = await get_conn()
+    _user_names.clear()
+    _follower_counts.clear()
+    async with conn.execute("SELECT userId, name FROM USERS") as cur:
+        for r in await cur.fetchall():
+            _user_names[r["userId"]] = r["name"]
+    async with conn.execute("SELECT followeeID, COUNT(*) AS n FROM FOLLOWERS GROUP BY followeeID") as cur:
+        for r in await cur.fetchall():
+            _follower_counts[r["followeeID"]] = r["n"]
+    _user_keys = sorted((key, u) for u, name in _user_names.items() for key in _index_keys(u, name))
+    _top_users = _build_top_users()
+
+def search_users(q: str, limit: int) -> List[UserSearchOut]:
+    q = " ".join(q.lower().split())
+    if not q:
+        return []
+    lo, hi = _prefix_range(q)
+    if hi - lo > USER_SEARCH_SCAN_LIMIT:
+        top = _top_users[q][:limit]
+    else:
+        top = _rank_range(lo, hi, limit)
+    return [UserSearchOut(userId=u, name=_user_names[u], followers=_follower_counts.get(u, 0)) for u in top]
 
 # ---------- AUTH Endpoints ----------
 @app.post("/register", status_code=201)
-def register(req: RegisterReq):
-    if user_exists(req.userID):
+async def register(req: RegisterReq):
+    if await user_exists(req.userID):
         raise HTTPException(status_code=409, detail="Username already exists")
 
-    hashed_pw = hash_password(req.password)
+    hashed_pw = await hash_password(req.password)
     date_created = datetime.date.today().isoformat()
 
     try:
-        conn = get_conn()
-        with db_lock:
-            cur = conn.cursor()
-            cur.execute("INSERT INTO USERS (userId, name, password, dateCreated) VALUES (?, ?, ?, ?)",
-                        (req.userID, req.name, hashed_pw, date_created))
-            conn.commit()
+        conn = await get_conn()
+        async with db_lock:
+            await conn.execute("INSERT INTO USERS (userId, name, password, dateCreated) VALUES (?, ?, ?, ?)",
+                               (req.userID, req.name, hashed_pw, date_created))
+            await conn.commit()
     except Exception as e:
         log_exception(e)
         raise HTTPException(status_code=500, detail="Failed to register user")
 
+    index_user(req.userID, req.name)
     return {"message": f"User '{req.userID}' registered successfully"}
 
 @app.post("/login")
-def login(form_data: OAuth2PasswordRequestForm = Depends()):
-    conn = get_conn()
-    cur = conn.cursor()
-    cur.execute("SELECT * FROM USERS WHERE userId = ?", (form_data.username,))
-    user = cur.fetchone()
-    if not user or not verify_password(form_data.password, user["password"]):
+async def login(form_data: OAuth2PasswordRequestForm = Depends()):
+    conn = await get_conn()
+    async with conn.execute("SELECT * FROM USERS WHERE userId = ?", (form_data.username,)) as cur:
+        user = await cur.fetchone()
+    if not user or not await verify_password(form_data.password, user["password"]):
         raise HTTPException(status_code=401, detail="Invalid username or password")
 
     token = create_access_token({"sub": user["userId"]})
     return {"access_token": token, "token_type": "bearer"}
 
 # ---------- Social Endpoints ----------
+@app.get("/users/search", response_model=List[UserSearchOut])
+async def user_search(q: str = Query(..., min_length=1, max_length=50), limit: int = Query(10, ge=1, le=USER_SEARCH_TOP_K)):
+    return search_users(q, limit)
+
+
 @app.post("/posts", status_code=201)
-def make_post(req: CreatePostReq, current_user: str = Depends(get_current_user)):
+async def make_post(req: CreatePostReq, current_user: str = Depends(get_current_user)):
     if req.userID != current_user:
         raise HTTPException(status_code=403, detail="Cannot create post for another user")
 
@@ -229,7 +706,8 @@ def make_post(req: CreatePostReq, current_user: str = Depends(get_current_user))
                 "Generate 3-6 short, trendy hashtags relevant to the text below. "
                 "Return only the hashtags separated by spaces or newlines.\n\n" + req.content
             )
-            response = model.generate_content(prompt)
+            async with gemini_semaphore:
+                response = await model.generate_content_async(prompt)
             # split by whitespace, strip punctuation
             print(response)
             print(response._result.candidates[0].content.parts[0].text)
@@ -245,14 +723,13 @@ def make_post(req: CreatePostReq, current_user: str = Depends(get_current_user))
     hashtags_json = json.dumps(hashtags_list)
 
     try:
-        conn = get_conn()
-        with db_lock:
-            cur = conn.cursor()
-            cur.execute(
+        conn = await get_conn()
+        async with db_lock:
+            cur = await conn.execute(
                 "INSERT INTO POST (userId, title, date, time, content, shared, hashtags) VALUES (?, ?, ?, ?, ?, ?, ?)",
                 (req.userID, req.title, date_str, time_str, req.content, 0, hashtags_json)
             )
-            conn.commit()
+            await conn.commit()
             post_id = cur.lastrowid
     except Exception as e:
         log_exception(e)
@@ -261,24 +738,24 @@ def make_post(req: CreatePostReq, current_user: str = Depends(get_current_user))
     return {"message": "POST CREATED SUCCESSFULLY", "postId": post_id, "hashtags": hashtags_list}
 
 @app.get("/posts/{userID}", response_model=List[PostOut])
-def list_posts(userID: str, limit: Optional[int] = Query(None, ge=1)):
-    if not user_exists(userID):
+async def list_posts(userID: str, limit: Optional[int] = Query(None, ge=1)):
+    if not await user_exists(userID):
         raise HTTPException(status_code=404, detail="USER NOT AVAILABLE")
 
-    conn = get_conn()
-    cur = conn.cursor()
+    conn = await get_conn()
     q = "SELECT * FROM POST WHERE userId = ? ORDER BY date DESC, time DESC"
+    params = (userID,)
     if limit:
         q = q + " LIMIT ?"
-        cur.execute(q, (userID, limit))
-    else:
-        cur.execute(q, (userID,))
-    rows = cur.fetchall()
+        params = (userID, limit)
+    async with conn.execute(q, params) as cur:
+        rows = await cur.fetchall()
+    record_views([r["postId"] for r in rows])
+    stats = await get_post_stats([r["postId"] for r in rows])
     out = []
     for r in rows:
-        cur2 = conn.cursor()
-        cur2.execute("SELECT name FROM USERS WHERE userId = ?", (r["userId"],))
-        author = cur2.fetchone()
+        async with conn.execute("SELECT name FROM USERS WHERE userId = ?", (r["userId"],)) as cur2:
+            author = await cur2.fetchone()
         out.append(PostOut(
             postId=r["postId"],
             userId=r["userId"],
@@ -288,20 +765,21 @@ def list_posts(userID: str, limit: Optional[int] = Query(None, ge=1)):
             time=r["time"],
             content=r["content"],
             shared=bool(r["shared"]),
-            hashtags=(json.loads(r["hashtags"]) if r["hashtags"] else [])
+            hashtags=(json.loads(r["hashtags"]) if r["hashtags"] else []),
+            likes=stats[r["postId"]][0],
+            views=stats[r["postId"]][1]
         ))
     return out
 
 @app.get("/feed/{userID}", response_model=List[PostOut])
-def show_feed(userID: str, limit: Optional[int] = Query(None, ge=1), current_user: str = Depends(get_current_user)):
+async def show_feed(userID: str, limit: Optional[int] = Query(None, ge=1), current_user: str = Depends(get_current_user)):
     if userID != current_user:
         raise HTTPException(status_code=403, detail="Cannot view another user's feed")
-    if not user_exists(userID):
+    if not await user_exists(userID):
         raise HTTPException(status_code=404, detail="USER NOT AVAILABLE")
-    conn = get_conn()
-    cur = conn.cursor()
+    conn = await get_conn()
     if limit:
-        cur.execute(
+        cur = await conn.execute(
             """
             SELECT p.* FROM POST p
             WHERE p.userId IN (
@@ -313,7 +791,7 @@ def show_feed(userID: str, limit: Optional[int] = Query(None, ge=1), current_use
             (userID, limit)
         )
     else:
-        cur.execute(
+        cur = await conn.execute(
             """
             SELECT p.* FROM POST p
             WHERE p.userId IN (
@@ -323,12 +801,14 @@ def show_feed(userID: str, limit: Optional[int] = Query(None, ge=1), current_use
             """,
             (userID,)
         )
-    rows = cur.fetchall()
+    rows = await cur.fetchall()
+    await cur.close()
+    record_views([r["postId"] for r in rows])
+    stats = await get_post_stats([r["postId"] for r in rows])
     out = []
     for r in rows:
-        cur2 = conn.cursor()
-        cur2.execute("SELECT name FROM USERS WHERE userId = ?", (r["userId"],))
-        author = cur2.fetchone()
+        async with conn.execute("SELECT name FROM USERS WHERE userId = ?", (r["userId"],)) as cur2:
+            author = await cur2.fetchone()
         out.append(PostOut(
             postId=r["postId"],
             userId=r["userId"],
@@ -338,56 +818,58 @@ def show_feed(userID: str, limit: Optional[int] = Query(None, ge=1), current_use
             time=r["time"],
             content=r["content"],
             shared=bool(r["shared"]),
-            hashtags=(json.loads(r["hashtags"]) if r["hashtags"] else [])
+            hashtags=(json.loads(r["hashtags"]) if r["hashtags"] else []),
+            likes=stats[r["postId"]][0],
+            views=stats[r["postId"]][1]
         ))
     return out
 
 @app.post("/follows", status_code=201)
-def follow_user(req: FollowReq, current_user: str = Depends(get_current_user)):
+async def follow_user(req: FollowReq, current_user: str = Depends(get_current_user)):
     if req.followerID != current_user:
         raise HTTPException(status_code=403, detail="Cannot follow on behalf of another user")
 
-    if not user_exists(req.followerID) or not user_exists(req.followeeID):
+    if not await user_exists(req.followerID) or not await user_exists(req.followeeID):
         raise HTTPException(status_code=404,
                             detail=f"CHECK WHETHER BOTH '{req.followerID}' AND '{req.followeeID}' ARE IN THE TABLE")
 
-    conn = get_conn()
-    cur = conn.cursor()
-    cur.execute("SELECT 1 FROM FOLLOWERS WHERE followerID = ? AND followeeID = ?", (req.followerID, req.followeeID))
-    if cur.fetchone():
-        raise HTTPException(status_code=409, detail="FOLLOW MAPPING ALREADY EXISTS")
+    conn = await get_conn()
+    async with conn.execute("SELECT 1 FROM FOLLOWERS WHERE followerID = ? AND followeeID = ?",
+                            (req.followerID, req.followeeID)) as cur:
+        if await cur.fetchone():
+            raise HTTPException(status_code=409, detail="FOLLOW MAPPING ALREADY EXISTS")
 
     try:
-        with db_lock:
-            cur.execute("INSERT INTO FOLLOWERS (followeeID, followerID) VALUES (?, ?)",
-                        (req.followeeID, req.followerID))
-            conn.commit()
+        async with db_lock:
+            await conn.execute("INSERT INTO FOLLOWERS (followeeID, followerID) VALUES (?, ?)",
+                               (req.followeeID, req.followerID))
+            await conn.commit()
     except Exception as e:
         log_exception(e)
         raise HTTPException(status_code=500, detail="THERE IS SOME ISSUE IN CREATING FOLLOW")
 
+    index_follow(req.followeeID)
     return {"message": f"FOLLOW OPERATION DONE SUCCESSFULLY WITH followerID='{req.followerID}' AND followeeID='{req.followeeID}'"}
 
 @app.post("/share", status_code=201)
-def share_post(req: ShareReq, current_user: str = Depends(get_current_user)):
+async def share_post(req: ShareReq, current_user: str = Depends(get_current_user)):
     if req.userID != current_user:
         raise HTTPException(status_code=403, detail="Cannot share as another user")
 
-    conn = get_conn()
-    cur = conn.cursor()
-    cur.execute("SELECT * FROM POST WHERE postId = ?", (req.postID,))
-    row = cur.fetchone()
+    conn = await get_conn()
+    async with conn.execute("SELECT * FROM POST WHERE postId = ?", (req.postID,)) as cur:
+        row = await cur.fetchone()
     if not row:
         raise HTTPException(status_code=404, detail="PLS ENTER A VALID POST ID")
 
     date_str, time_str = iso_date_time()
     try:
-        with db_lock:
-            cur.execute(
+        async with db_lock:
+            cur = await conn.execute(
                 "INSERT INTO POST (userId, title, date, time, content, shared) VALUES (?, ?, ?, ?, ?, ?)",
                 (req.userID, row["title"], date_str, time_str, row["content"], 1)
             )
-            conn.commit()
+            await conn.commit()
             new_post_id = cur.lastrowid
     except Exception as e:
         log_exception(e)
@@ -395,18 +877,43 @@ def share_post(req: ShareReq, current_user: str = Depends(get_current_user)):
 
     return {"message": "POST SHARED SUCCESSFULLY", "postId": new_post_id}
 
+@app.post("/posts/{postID}/like")
+async def like_post(postID: int, current_user: str = Depends(get_current_user)):
+    if not await post_exists(postID):
+        raise HTTPException(status_code=404, detail="Post not found")
+
+    await set_like(current_user, postID, True)
+    likes, _ = (await get_post_stats([postID]))[postID]
+    return {"message": "POST LIKED", "postId": postID, "liked": True, "likes": likes}
+
+@app.delete("/posts/{postID}/like")
+async def unlike_post(postID: int, current_user: str = Depends(get_current_user)):
+    if not await post_exists(postID):
+        raise HTTPException(status_code=404, detail="Post not found")
+
+    await set_like(current_user, postID, False)
+    likes, _ = (await get_post_stats([postID]))[postID]
+    return {"message": "POST UNLIKED", "postId": postID, "liked": False, "likes": likes}
+
+@app.get("/posts/{postID}/stats")
+async def post_stats(postID: int):
+    if not await post_exists(postID):
+        raise HTTPException(status_code=404, detail="Post not found")
+
+    likes, views = (await get_post_stats([postID]))[postID]
+    return {"postId": postID, "likes": likes, "views": views}
+
 
 @app.post("/hashtags")
-def generate_hashtags(req: HashtagReq, current_user: str = Depends(get_current_user)):
+async def generate_hashtags(req: HashtagReq, current_user: str = Depends(get_current_user)):
     if not req.content and not req.postID:
         raise HTTPException(status_code=400, detail="Provide either postID or content")
 
     text = req.content
     if req.postID:
-        conn = get_conn()
-        cur = conn.cursor()
-        cur.execute("SELECT content FROM POST WHERE postId = ?", (req.postID,))
-        row = cur.fetchone()
+        conn = await get_conn()
+        async with conn.execute("SELECT content FROM POST WHERE postId = ?", (req.postID,)) as cur:
+            row = await cur.fetchone()
         if not row:
             raise HTTPException(status_code=404, detail="Post not found")
         text = row["content"]
@@ -415,7 +922,8 @@ def generate_hashtags(req: HashtagReq, current_user: str = Depends(get_current_u
     try:
         model = genai.GenerativeModel("gemini-2.5-flash")
         prompt = f"Translate the following text to {req.language}. Just return the translated output:\n\n tamil"
-        response = model.generate_content(prompt)
+        async with gemini_semaphore:
+            response = await model.generate_content_async(prompt)
 
         hashtags = response.text.strip()
         return {"hashtags": text}
@@ -424,17 +932,17 @@ def generate_hashtags(req: HashtagReq, current_user: str = Depends(get_current_u
         raise HTTPException(status_code=500, detail="Failed to generate hashtags")
 
 @app.post("/image")
-def generate_image(req: HashtagReq, current_user: str = Depends(get_current_user)):
-    from openai import OpenAI
+async def generate_image(req: HashtagReq, current_user: str = Depends(get_current_user)):
     import base64
 
-    client = OpenAI(api_key="") 
+    client = get_openai_client()
 
-    response = client.responses.create(
-        model="gpt-5",
-        input="Generate an image for the following content: " + (req.content or ""),
-        tools=[{"type": "image_generation"}],
-    )
+    async with openai_semaphore:
+        response = await client.responses.create(
+            model="gpt-5",
+            input="Generate an image for the following content: " + (req.content or ""),
+            tools=[{"type": "image_generation"}],
+        )
 
     # Save the image to a file
     image_data = [
@@ -445,20 +953,22 @@ def generate_image(req: HashtagReq, current_user: str = Depends(get_current_user
         
     if image_data:
         image_base64 = image_data[0]
-        with open("output.png", "wb") as f:
-            f.write(base64.b64decode(image_base64))
+        await run_in_threadpool(_write_image, "output.png", base64.b64decode(image_base64))
+
+def _write_image(path: str, data: bytes):
+    with open(path, "wb") as f:
+        f.write(data)
 
 @app.post("/translate")
-def generate_translate(req: HashtagReq, current_user: str = Depends(get_current_user)):
+async def generate_translate(req: HashtagReq, current_user: str = Depends(get_current_user)):
     if not req.content and not req.postID:
         raise HTTPException(status_code=400, detail="Provide either postID or content")
 
     text = req.content
     if req.postID:
-        conn = get_conn()
-        cur = conn.cursor()
-        cur.execute("SELECT content FROM POST WHERE postId = ?", (req.postID,))
-        row = cur.fetchone()
+        conn = await get_conn()
+        async with conn.execute("SELECT content FROM POST WHERE postId = ?", (req.postID,)) as cur:
+            row = await cur.fetchone()
         if not row:
             raise HTTPException(status_code=404, detail="Post not found")
         text = row["content"]
@@ -467,7 +977,8 @@ def generate_translate(req: HashtagReq, current_user: str = Depends(get_current_
     try:
         model = genai.GenerativeModel("gemini-2.5-flash")
         prompt = f"Translate the following text to {req.language}. Just return the translated output:\n\n{text}"
-        response = model.generate_content(prompt)
+        async with gemini_semaphore:
+            response = await model.generate_content_async(prompt)
 
         hashtags = response.text.strip()
         return {"hashtags": hashtags}
@@ -0,0 +1,223 @@
+# maintenance.py
+# Online maintenance for main.db: hot backup, ANALYZE, incremental vacuum,
+# WAL checkpoints and integrity checks.
+#
+# Every task opens its own short-lived sqlite3 connection, so it never touches
+# the shared connection the API holds in get_conn(). The API runs the database
+# in WAL mode, which lets these readers work alongside its writers.
+#
+#   python maintenance.py backup
+#   python maintenance.py all
+#   python maintenance.py schedule --interval 3600
+import argparse
+import datetime
+import logging
+import os
+import sqlite3
+import time
+
+DB_PATH = "main.db"
+BACKUP_DIR = "backups"
+BACKUP_KEEP = 7
+# -1 copies everything in one step: under WAL that only holds a read snapshot,
+# so writers carry on. Stepped copies restart whenever another connection writes.
+BACKUP_PAGES_PER_STEP = -1
+BACKUP_MAX_RESTARTS = 3
+VACUUM_PAGES = 1000
+BUSY_TIMEOUT = 30
+
+logging.basicConfig(filename="logfile.log", level=logging.INFO,
+                    format="%(asctime)s : %(levelname)s : %(message)s")
+
+
+def _connect(db_path: str) -> sqlite3.Connection:
+    return sqlite3.connect(db_path, timeout=BUSY_TIMEOUT)
+
+def _report(task: str, started: float, pages: int, **extra) -> dict:
+    result = {"task": task, "duration": round(time.monotonic() - started, 3), "pages": pages, **extra}
+    logging.info("maintenance %s", result)
+    return result
+
+def _page_count(conn: sqlite3.Connection) -> int:
+    return conn.execute("PRAGMA page_count").fetchone()[0]
+
+
+def backup(db_path: str = DB_PATH, backup_dir: str = BACKUP_DIR, keep: int = BACKUP_KEEP,
+           pages: int = BACKUP_PAGES_PER_STEP, max_restarts: int = BACKUP_MAX_RESTARTS) -> dict:
+    """Copy the live database with the online backup API, `pages` pages per
+    step. Gives up if a stepped copy is restarted by writers more than
+    `max_restarts` times."""
+    started = time.monotonic()
+    os.makedirs(backup_dir, exist_ok=True)
+    stamp = datetime.datetime.now().strftime("%Y%m%d-%H%M%S-%f")
+    base = os.path.splitext(os.path.basename(db_path))[0]
+    dest_path = os.path.join(backup_dir, f"{base}-{stamp}.db")
+
+    copied = 0
+    restarts = 0
+    last_remaining = None
+    def progress(status, remaining, total):
+        nonlocal copied, restarts, last_remaining
+        if last_remaining is not None and remaining > last_remaining:
+            # the source was written to and the copy started over from page 0
+            restarts += 1
+            if restarts > max_restarts:
+                raise RuntimeError(f"backup restarted {restarts} times by concurrent writes, giving up")
+            copied += total - remaining
+        else:
+            copied += (total if last_remaining is None else last_remaining) - remaining
+        last_remaining = remaining
+
+    src = _connect(db_path)
+    dest = sqlite3.connect(dest_path)
+    try:
+        src.backup(dest, pages=pages, progress=progress)
+    except BaseException:
+        dest.close()
+        os.remove(dest_path)
+        raise
+    finally:
+        dest.close()
+        src.close()
+
+    removed = []
+    if keep:
+        old = sorted(f for f in os.listdir(backup_dir) if f.startswith(base + "-") and f.endswith(".db"))
+        for name in old[:-keep]:
+            os.remove(os.path.join(backup_dir, name))
+            removed.append(name)
+    return _report("backup", started, copied, path=dest_path, restarts=restarts, removed=removed)
+
+def analyze(db_path: str = DB_PATH) -> dict:
+    """Refresh planner statistics so new indexes get picked up."""
+    started = time.monotonic()
+    conn = _connect(db_path)
+    try:
+        conn.execute("ANALYZE")
+        conn.execute("PRAGMA optimize")
+        conn.commit()
+        pages = _page_count(conn)
+    finally:
+        conn.close()
+    return _report("analyze", started, pages)
+
+def vacuum(db_path: str = DB_PATH, pages: int = VACUUM_PAGES, full: bool = False) -> dict:
+    """Release up to `pages` free pages with incremental vacuum. With `full`,
+    switch the file to auto_vacuum=INCREMENTAL first (a one-off blocking VACUUM)."""
+    started = time.monotonic()
+    conn = _connect(db_path)
+    try:
+        mode = conn.execute("PRAGMA auto_vacuum").fetchone()[0]
+        if mode != 2:
+            if not full:
+                return _report("vacuum", started, 0, skipped="auto_vacuum is not INCREMENTAL, run with --full once")
+            conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+            conn.execute("VACUUM")
+            # a full VACUUM rewrites every page
+            return _report("vacuum", started, _page_count(conn), full=True)
+
+        before = conn.execute("PRAGMA freelist_count").fetchone()[0]
+        conn.execute(f"PRAGMA incremental_vacuum({int(pages)})")
+        conn.commit()
+        after = conn.execute("PRAGMA freelist_count").fetchone()[0]
+    finally:
+        conn.close()
+    return _report("vacuum", started, before - after, freelist=after)
+
+def checkpoint(db_path: str = DB_PATH, mode: str = "PASSIVE") -> dict:
+    """Checkpoint the WAL. PASSIVE never waits on writers; TRUNCATE also
+    shrinks the -wal file but has to wait for them."""
+    started = time.monotonic()
+    mode = mode.upper()
+    if mode not in ("PASSIVE", "FULL", "RESTART", "TRUNCATE"):
+        raise ValueError(f"unknown checkpoint mode '{mode}'")
+    conn = _connect(db_path)
+    try:
+        busy, wal_pages, checkpointed = conn.execute(f"PRAGMA wal_checkpoint({mode})").fetchone()
+    finally:
+        conn.close()
+    return _report("checkpoint", started, max(checkpointed, 0), wal_pages=wal_pages, busy=bool(busy))
+
+def integrity(db_path: str = DB_PATH, full: bool = False) -> dict:
+    """quick_check by default; integrity_check with `full` (also verifies indexes)."""
+    started = time.monotonic()
+    conn = _connect(db_path)
+    try:
+        rows = conn.execute("PRAGMA integrity_check" if full else "PRAGMA quick_check").fetchall()
+        pages = _page_count(conn)
+    finally:
+        conn.close()
+    errors = [r[0] for r in rows if r[0] != "ok"]
+    if errors:
+        logging.error("integrity check failed: %s", errors)
+    return _report("integrity", started, pages, ok=not errors, errors=errors)
+
+def run_all(db_path: str = DB_PATH, backup_dir: str = BACKUP_DIR) -> list:
+    results = []
+    for task in (lambda: integrity(db_path),
+                 lambda: backup(db_path, backup_dir),
+                 lambda: checkpoint(db_path),
+                 lambda: vacuum(db_path),
+                 lambda: analyze(db_path)):
+        try:
+            results.append(task())
+        except Exception as e:
+            logging.exception(e)
+    return results
+
+
+def _print(result: dict):
+    extra = {k: v for k, v in result.items() if k not in ("task", "duration", "pages")}
+    print(f"{result['task']}: {result['pages']} pages in {result['duration']:.3f}s {extra if extra else ''}".rstrip())
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="TinySocial database maintenance")
+    parser.add_argument("--db", default=DB_PATH)
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("backup")
+    p.add_argument("--dir", default=BACKUP_DIR)
+    p.add_argument("--keep", type=int, default=BACKUP_KEEP)
+    p.add_argument("--pages", type=int, default=BACKUP_PAGES_PER_STEP, help="pages per step, -1 for all at once")
+    p.add_argument("--max-restarts", type=int, default=BACKUP_MAX_RESTARTS)
+    sub.add_parser("analyze")
+    p = sub.add_parser("vacuum")
+    p.add_argument("--pages", type=int, default=VACUUM_PAGES)
+    p.add_argument("--full", action="store_true")
+    p = sub.add_parser("checkpoint")
+    p.add_argument("--mode", default="PASSIVE")
+    p = sub.add_parser("integrity")
+    p.add_argument("--full", action="store_true")
+    p = sub.add_parser("all")
+    p.add_argument("--dir", default=BACKUP_DIR)
+    p = sub.add_parser("schedule")
+    p.add_argument("--dir", default=BACKUP_DIR)
+    p.add_argument("--interval", type=float, default=3600, help="seconds between runs")
+    args = parser.parse_args(argv)
+
+    if args.command == "backup":
+        results = [backup(args.db, args.dir, args.keep, args.pages, args.max_restarts)]
+    elif args.command == "analyze":
+        results = [analyze(args.db)]
+    elif args.command == "vacuum":
+        results = [vacuum(args.db, args.pages, args.full)]
+    elif args.command == "checkpoint":
+        results = [checkpoint(args.db, args.mode)]
+    elif args.command == "integrity":
+        results = [integrity(args.db, args.full)]
+    elif args.command == "all":
+        results = run_all(args.db, args.dir)
+    else:
+        while True:
+            for result in run_all(args.db, args.dir):
+                _print(result)
+            time.sleep(args.interval)
+
+    for result in results:
+        _print(result)
+    if any(r.get("ok") is False for r in results):
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
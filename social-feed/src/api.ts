@@ -114,6 +114,11 @@ export const api = {
     return response.json();
   },
 
+  searchUsers: async (q: string, limit: number = 10) => {
+    const response = await fetch(`${API_BASE_URL}/users/search?q=${encodeURIComponent(q)}&limit=${limit}`);
+    return response.json();
+  },
+
   // Social features
   followUser: async (followerID: string, followeeID: string) => {
     const response = await fetch(`${API_BASE_URL}/follows`, {
@@ -127,6 +132,26 @@ export const api = {
     return response.json();
   },
 
+  likePost: async (postID: number) => {
+    const response = await fetch(`${API_BASE_URL}/posts/${postID}/like`, {
+      method: 'POST',
+      headers: {
+        'Authorization': `Bearer ${getAuthToken()}`,
+      },
+    });
+    return response.json();
+  },
+
+  unlikePost: async (postID: number) => {
+    const response = await fetch(`${API_BASE_URL}/posts/${postID}/like`, {
+      method: 'DELETE',
+      headers: {
+        'Authorization': `Bearer ${getAuthToken()}`,
+      },
+    });
+    return response.json();
+  },
+
   sharePost: async (userID: string, postID: number) => {
     const response = await fetch(`${API_BASE_URL}/share`, {
       method: 'POST',
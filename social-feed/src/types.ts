@@ -13,6 +13,14 @@ export interface Post {
   content: string;
   shared: boolean;
   hashtags?: string[];
+  likes: number;
+  views: number;
+}
+
+export interface UserSearchResult {
+  userId: string;
+  name: string;
+  followers: number;
 }
 
 export interface AuthContextType {